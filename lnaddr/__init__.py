@@ -0,0 +1,17 @@
+from .client import (
+    LNURLError,
+    clear_lnurlp_cache,
+    get_bolt11,
+    get_bolt11_many,
+    get_bolt11_many_http2,
+    get_payurl,
+)
+
+__all__ = [
+    "LNURLError",
+    "clear_lnurlp_cache",
+    "get_bolt11",
+    "get_bolt11_many",
+    "get_bolt11_many_http2",
+    "get_payurl",
+]
@@ -0,0 +1,39 @@
+import argparse
+import logging
+import sys
+
+import requests
+
+from .client import LNURLError, get_bolt11, logger
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a BOLT11 invoice from a Lightning Address.")
+    parser.add_argument("-v", "--verbose", action="store_true", help="trace the LNURL-pay requests on stdout")
+    args = parser.parse_args()
+    if args.verbose:
+        logger.setLevel(logging.DEBUG)
+        logger.addHandler(logging.StreamHandler(sys.stdout))
+
+    email = input("Enter your Lightning Address: ").strip()
+    while True:
+        user_input = input("Enter desired amount: ")
+        try:
+            amount = int(user_input)
+            if amount < 0:
+                raise ValueError
+            break
+        except ValueError:
+            print("Amount must be a non-negative integer.")
+    try:
+        bolt11 = get_bolt11(email, amount)
+    except LNURLError as e:
+        print(f"The Lightning Address provider returned an error: {e}")
+    except ValueError as e:
+        print(f"Cannot make a Bolt11: {e}")
+    except requests.RequestException as e:
+        print(f"Could not reach the Lightning Address provider: {e}")
+    else:
+        print(f"Generated bolt11: {bolt11}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,537 @@
+import requests
+import json
+import logging
+import asyncio
+import importlib.util
+import re
+import socket
+import threading
+import time
+from functools import lru_cache, partial
+from collections import OrderedDict
+from threading import Lock
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+import urllib3.exceptions
+from urllib3.exceptions import ConnectTimeoutError
+from urllib3.util.connection import allowed_gai_family
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger("lnaddr")
+
+try:
+    import orjson
+
+    def _loads(data):
+        return orjson.loads(data)
+except ImportError:
+    def _loads(data):
+        return json.loads(data)
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+class LNURLError(Exception):
+    """The LNURL-pay provider returned something that is not a usable response."""
+
+# (connect, read) timeouts for every LNURL request.
+_TIMEOUT = (3.05, 10)
+
+# What each HTTP backend raises when a provider stops responding.
+_TIMEOUT_ERRORS = (requests.Timeout, asyncio.TimeoutError)
+if httpx is not None:
+    _TIMEOUT_ERRORS += (httpx.TimeoutException,)
+
+# Failures of a single request; anything else is a bug and propagates.
+_FETCH_ERRORS = (requests.RequestException, LNURLError)
+if aiohttp is not None:
+    _FETCH_ERRORS += (aiohttp.ClientError,)
+if httpx is not None:
+    _FETCH_ERRORS += (httpx.HTTPError,)
+
+_SESSION = None
+_SESSION_LOCK = Lock()
+
+def _get_session():
+    """Return the process-wide requests.Session, creating it on first use."""
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                # read=False: a provider that accepted the connection but
+                # stalls is reported as requests.ReadTimeout straight away
+                # rather than retried into a generic ConnectionError.
+                retry = Retry(
+                    total=3,
+                    read=False,
+                    backoff_factor=0.3,
+                    status_forcelist=(500, 502, 503, 504),
+                    allowed_methods=frozenset(["GET", "POST"]),
+                )
+                adapter = _CachedDNSAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry)
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _SESSION = session
+    return _SESSION
+
+class _TTLCache:
+    """Small thread-safe LRU mapping whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+# getaddrinfo results per (host, port) for connections opened by our own
+# session. Entries are short-lived, but hosts used recently are re-resolved
+# in the background so lookups stay warm.
+_DNS = _TTLCache(maxsize=1024, ttl=15)
+# (host, port) -> [decayed hit count, last use], least recently used first.
+_DNS_HITS = OrderedDict()
+_DNS_HITS_MAX = 256
+_DNS_IDLE = 300
+_DNS_LOCK = Lock()
+_DNS_WARMER = None
+_DNS_WARM_TOP_N = 16
+_DNS_WARM_INTERVAL = 10
+
+def _resolve(host, port):
+    infos = socket.getaddrinfo(host, port, allowed_gai_family(), socket.SOCK_STREAM)
+    _DNS.set((host, port), infos)
+    return infos
+
+def _note_host(key):
+    with _DNS_LOCK:
+        entry = _DNS_HITS.get(key)
+        if entry is None:
+            _DNS_HITS[key] = [1, time.monotonic()]
+        else:
+            entry[0] += 1
+            entry[1] = time.monotonic()
+            _DNS_HITS.move_to_end(key)
+        while len(_DNS_HITS) > _DNS_HITS_MAX:
+            _DNS_HITS.popitem(last=False)
+    _start_dns_warmer()
+
+def _cached_getaddrinfo(host, port):
+    _note_host((host, port))
+    infos = _DNS.get((host, port))
+    if infos is None:
+        infos = _resolve(host, port)
+    return infos
+
+def _hosts_to_warm():
+    """Halve every hit count, forget idle hosts and return the busiest ones."""
+    global _DNS_WARMER
+    cutoff = time.monotonic() - _DNS_IDLE
+    with _DNS_LOCK:
+        for key, entry in list(_DNS_HITS.items()):
+            if entry[1] < cutoff:
+                del _DNS_HITS[key]
+            else:
+                entry[0] /= 2
+        if not _DNS_HITS:
+            # Nothing left to keep warm; the next lookup starts a new warmer.
+            _DNS_WARMER = None
+            return None
+        return sorted(_DNS_HITS, key=lambda k: _DNS_HITS[k][0], reverse=True)[:_DNS_WARM_TOP_N]
+
+def _dns_warmer():
+    while True:
+        time.sleep(_DNS_WARM_INTERVAL)
+        top = _hosts_to_warm()
+        if top is None:
+            return
+        for host, port in top:
+            try:
+                _resolve(host, port)
+            except OSError as e:
+                logger.debug("DNS warm-up failed for %s: %s", host, e)
+
+def _start_dns_warmer():
+    global _DNS_WARMER
+    if _DNS_WARMER is None:
+        with _DNS_LOCK:
+            if _DNS_WARMER is None:
+                _DNS_WARMER = threading.Thread(target=_dns_warmer, name="lnurl-dns-warmer", daemon=True)
+                _DNS_WARMER.start()
+
+class _CachedDNSConnectionMixin:
+    """Resolve through the _DNS cache, then connect to each address in turn.
+
+    Only the socket address changes; TLS SNI and certificate checks still
+    use ``self.host``.
+    """
+
+    def _new_conn(self):
+        host = self._dns_host
+        try:
+            infos = _cached_getaddrinfo(host, self.port)
+        except OSError:
+            infos = None
+        if not infos:
+            return super()._new_conn()
+        err = None
+        try:
+            for _family, _type, _proto, _canonname, sockaddr in infos:
+                self._dns_host = sockaddr[0]
+                try:
+                    return super()._new_conn()
+                except ConnectTimeoutError as e:
+                    err = e
+        finally:
+            self._dns_host = host
+        raise err
+
+class _CachedDNSHTTPConnection(_CachedDNSConnectionMixin, HTTPConnection):
+    pass
+
+class _CachedDNSHTTPSConnection(_CachedDNSConnectionMixin, HTTPSConnection):
+    pass
+
+class _CachedDNSHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _CachedDNSHTTPConnection
+
+class _CachedDNSHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CachedDNSHTTPSConnection
+
+class _CachedDNSAdapter(HTTPAdapter):
+    """HTTPAdapter whose direct connections resolve hosts through _DNS."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CachedDNSHTTPConnectionPool,
+            "https": _CachedDNSHTTPSConnectionPool,
+        }
+
+# LNURL-pay discovery results (callback, minSendable, maxSendable), keyed
+# by lightning address. While an entry lives, invoices skip the discovery
+# request entirely and amounts above maxSendable are rejected without any
+# request, so a bounds or callback change on the provider side can go
+# unnoticed for up to the TTL; a failed callback drops the entry and falls
+# back to a fresh discovery.
+_DISCOVERY = _TTLCache(maxsize=4096, ttl=300)
+_DISCOVERY_KEYS = ("callback", "minSendable", "maxSendable")
+
+# LUD-16 usernames are [a-z0-9-_.+]; a name of only dots would turn into a
+# ".." path segment. The domain is a dotted hostname with an optional port.
+_LNADDR_RE = re.compile(
+    r"^(?!\.+@)(?P<username>[a-z0-9\-_.+]+)"
+    r"@(?P<domain>[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)+(?::[0-9]{1,5})?)$"
+)
+
+def clear_lnurlp_cache():
+    _DISCOVERY.clear()
+
+@lru_cache(maxsize=4096)
+def get_payurl(email):
+    match = _LNADDR_RE.match(email) if isinstance(email, str) else None
+    if match is None:
+        raise ValueError("Possibly a malformed LN Address: " + str(email))
+    username, domain = match.group("username", "domain")
+    return f"https://{domain}/.well-known/lnurlp/{username}"
+
+def get_url(path, headers):
+    response = _get_session().get(path, headers=headers, timeout=_TIMEOUT)
+    return response.content
+
+def parse_json(data, url):
+    try:
+        return _loads(data)
+    except ValueError as e:
+        raise LNURLError(f"invalid JSON from {url}") from e
+
+def get_json(path, headers=None):
+    return parse_json(get_url(path, headers=headers or {}), path)
+
+# A discovery body whose unread remainder is at most this many bytes is
+# drained after the fields we need are found, so the connection goes back
+# to the pool for the callback request. Larger or unsized remainders are
+# dropped with the connection instead: the callback then pays for a new
+# TCP+TLS handshake, which beats downloading an arbitrarily large body.
+_DRAIN_LIMIT = 256 * 1024
+
+def get_discovery(path):
+    """Fetch a LNURL-pay discovery document, keeping only the fields we use.
+
+    With ijson installed the body is parsed as it streams in and the read
+    stops once callback, minSendable and maxSendable have been seen, so
+    large metadata blobs are never held in memory (see _DRAIN_LIMIT for
+    what happens to the rest of the body). The async batch paths do not
+    stream; they buffer and parse the whole document.
+    """
+    if ijson is None:
+        return get_json(path)
+    with _get_session().get(path, timeout=_TIMEOUT, stream=True) as response:
+        response.raw.decode_content = True
+        datablock = {}
+        try:
+            for prefix, event, value in ijson.parse(response.raw):
+                if prefix in _DISCOVERY_KEYS and event in ("string", "number"):
+                    datablock[prefix] = value
+                    if len(datablock) == len(_DISCOVERY_KEYS):
+                        break
+        except ijson.JSONError as e:
+            raise LNURLError(f"invalid JSON from {path}") from e
+        # Reading response.raw bypasses requests' own error translation.
+        except urllib3.exceptions.ReadTimeoutError as e:
+            raise requests.ReadTimeout(e, response=response) from e
+        except urllib3.exceptions.HTTPError as e:
+            raise requests.ConnectionError(e, response=response) from e
+        length = response.headers.get("Content-Length", "")
+        if length.isdigit() and int(length) - response.raw.tell() <= _DRAIN_LIMIT:
+            response.raw.drain_conn()
+        return datablock
+
+# Largest amount, in sats, accepted before talking to the provider at all:
+# the biggest whole-sat amount whose msat value still fits in an unsigned
+# 32-bit integer, which some LNURL implementations use. The provider's own
+# maxSendable still applies on top of this.
+_MAX_AMOUNT_SAT = (2**32 - 1) // 1000
+
+def validate_amount(amount):
+    if amount is None:
+        return
+    if isinstance(amount, bool) or not isinstance(amount, int):
+        raise ValueError(f"amount must be a whole number of sats, got {amount!r}")
+    if amount < 0 or amount > _MAX_AMOUNT_SAT:
+        raise ValueError(f"amount must be between 0 and {_MAX_AMOUNT_SAT} sats, got {amount}")
+
+def _msat_field(datablock, key):
+    value = datablock[key]
+    try:
+        return int(value)
+    except (TypeError, ValueError) as e:
+        raise LNURLError(f"malformed LNURL response, {key} is {value!r}") from e
+
+def parse_discovery(datablock):
+    """Check a discovery document and keep just callback and the bounds.
+
+    Raises LNURLError unless it is a JSON object with a string callback and
+    integer minSendable (and maxSendable, when present).
+    """
+    if not isinstance(datablock, dict):
+        raise LNURLError("malformed LNURL response, expected a JSON object")
+    try:
+        lnurlpay = datablock["callback"]
+        parsed = {"callback": lnurlpay, "minSendable": _msat_field(datablock, "minSendable")}
+    except KeyError as e:
+        raise LNURLError(f"malformed LNURL response, missing {e}") from e
+    if not isinstance(lnurlpay, str):
+        raise LNURLError(f"malformed LNURL response, callback is {lnurlpay!r}")
+    if datablock.get("maxSendable") is not None:
+        parsed["maxSendable"] = _msat_field(datablock, "maxSendable")
+    return parsed
+
+def check_bounds(datablock, amount_msat):
+    max_amount = datablock.get("maxSendable")
+    if amount_msat is not None and max_amount is not None and amount_msat > max_amount:
+        raise ValueError(f"amount {amount_msat} msat exceeds maxSendable {max_amount} msat")
+
+def remember_discovery(email, datablock):
+    _DISCOVERY.set(email, datablock)
+
+def build_payquery(datablock, amount_msat):
+    lnurlpay = datablock["callback"]
+    min_amount = datablock["minSendable"]
+
+    if amount_msat is None or amount_msat < min_amount:
+        amount_msat = min_amount
+
+    # The callback may already carry query parameters of its own.
+    sep = '&' if '?' in lnurlpay else '?'
+    payquery = f"{lnurlpay}{sep}amount={amount_msat}"
+
+    logger.info("amount (msat): %s", amount_msat)
+    logger.info("payquery: %s", payquery)
+    return payquery
+
+# BOLT11 invoices are plain ASCII bech32, so uppercasing is a byte mapping.
+_UPPER = bytes.maketrans(b"abcdefghijklmnopqrstuvwxyz", b"ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+
+def extract_bolt11(pr_dict):
+    if not isinstance(pr_dict, dict):
+        raise LNURLError("malformed callback response, expected a JSON object")
+
+    if 'pr' in pr_dict:
+        bolt11 = pr_dict['pr']
+        if not isinstance(bolt11, str) or not bolt11.isascii():
+            raise LNURLError(f"malformed callback response, pr is {bolt11!r}")
+        ubolt11 = bolt11.encode('ascii').translate(_UPPER).decode('ascii')
+        return ubolt11
+
+    elif 'reason' in pr_dict:
+        raise LNURLError(f"provider refused the invoice: {pr_dict['reason']}")
+
+    raise LNURLError("callback response has neither 'pr' nor 'reason'")
+
+def _bolt11_steps(email, amount):
+    """The get_bolt11 flow, with every HTTP request left to the caller.
+
+    Yields ``(kind, url)`` pairs, where kind is "discovery" or "callback".
+    The driver fetches the URL and sends the parsed body back in, or throws
+    the fetch error into the generator. The generator's return value is the
+    result of get_bolt11. _drive and _drive_async run it synchronously or
+    on an event loop, so both paths share one copy of the caching logic.
+    """
+    validate_amount(amount)
+    amount_msat = None if amount is None else amount * 1000
+    # Checked here because get_payurl and _DISCOVERY both need a hashable key.
+    if not isinstance(email, str):
+        raise ValueError(f"Possibly a malformed LN Address: {email!r}")
+    purl = get_payurl(email)
+    logger.info("Transformed URL: %s", purl)
+
+    datablock = _DISCOVERY.get(email)
+    if datablock is not None:
+        check_bounds(datablock, amount_msat)
+        try:
+            pr_dict = yield "callback", build_payquery(datablock, amount_msat)
+        except _TIMEOUT_ERRORS:
+            raise
+        except _FETCH_ERRORS as e:
+            logger.info("cached callback failed, rediscovering: %s", e)
+            pr_dict = {}
+        if isinstance(pr_dict, dict) and 'pr' in pr_dict:
+            return extract_bolt11(pr_dict)
+        _DISCOVERY.pop(email)
+
+    datablock = parse_discovery((yield "discovery", purl))
+    remember_discovery(email, datablock)
+    check_bounds(datablock, amount_msat)
+
+    payquery = build_payquery(datablock, amount_msat)
+
+    pr_dict = yield "callback", payquery
+
+    return extract_bolt11(pr_dict)
+
+def _drive(steps, fetchers):
+    try:
+        kind, url = next(steps)
+        while True:
+            try:
+                body = fetchers[kind](url)
+            except Exception as e:
+                kind, url = steps.throw(e)
+            else:
+                kind, url = steps.send(body)
+    except StopIteration as stop:
+        return stop.value
+
+async def _drive_async(steps, fetchers):
+    try:
+        kind, url = next(steps)
+        while True:
+            try:
+                body = await fetchers[kind](url)
+            except Exception as e:
+                kind, url = steps.throw(e)
+            else:
+                kind, url = steps.send(body)
+    except StopIteration as stop:
+        return stop.value
+
+def get_bolt11(email, amount):
+    """Return the uppercased BOLT11 invoice for ``amount`` sats to ``email``.
+
+    A malformed address or amount raises ValueError. A provider error
+    ({"status": "ERROR", "reason": ...}) or an answer that cannot be used
+    raises LNURLError. Network failures left over after the session's
+    retries raise requests.RequestException.
+    """
+    return _drive(_bolt11_steps(email, amount), {"discovery": get_discovery, "callback": get_json})
+
+async def _fetch_json(session, url):
+    async with session.get(url, timeout=aiohttp.ClientTimeout(connect=_TIMEOUT[0], sock_read=_TIMEOUT[1])) as r:
+        return parse_json(await r.read(), url)
+
+async def _fetch_json_httpx(client, url):
+    r = await client.get(url, timeout=httpx.Timeout(_TIMEOUT[1], connect=_TIMEOUT[0]))
+    return parse_json(r.content, url)
+
+async def _get_bolt11_async(fetch_json, email, amount):
+    fetchers = {"discovery": fetch_json, "callback": fetch_json}
+    return await _drive_async(_bolt11_steps(email, amount), fetchers)
+
+# Per-address failures that a batch reports in that address's slot; any
+# other exception is a bug and aborts the whole batch.
+_BATCH_ERRORS = (ValueError,) + _FETCH_ERRORS + _TIMEOUT_ERRORS
+
+async def _get_bolt11_or_error(fetch_json, email, amount):
+    try:
+        return await _get_bolt11_async(fetch_json, email, amount)
+    except _BATCH_ERRORS as e:
+        return e
+
+async def _run(pairs):
+    connector = aiohttp.TCPConnector(limit=100, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        fetch_json = partial(_fetch_json, session)
+        return await asyncio.gather(*[_get_bolt11_or_error(fetch_json, e, a) for e, a in pairs])
+
+def get_bolt11_many(pairs):
+    """Resolve (email, amount) pairs concurrently, returning results in order.
+
+    Each result is either the invoice get_bolt11 would return, or the
+    ValueError, LNURLError or network error it would have raised for that
+    pair. Any other exception propagates.
+    """
+    if aiohttp is None:
+        raise RuntimeError("get_bolt11_many requires aiohttp (pip install aiohttp)")
+    return asyncio.run(_run(pairs))
+
+async def _run_http2(pairs):
+    limits = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+    async with httpx.AsyncClient(http2=True, limits=limits, follow_redirects=True) as client:
+        fetch_json = partial(_fetch_json_httpx, client)
+        return await asyncio.gather(*[_get_bolt11_or_error(fetch_json, e, a) for e, a in pairs])
+
+def get_bolt11_many_http2(pairs):
+    """Like get_bolt11_many, but multiplexes requests per host over HTTP/2."""
+    if httpx is None or importlib.util.find_spec("h2") is None:
+        raise RuntimeError("get_bolt11_many_http2 requires httpx with HTTP/2 support (pip install 'httpx[http2]')")
+    return asyncio.run(_run_http2(pairs))
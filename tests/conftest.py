@@ -0,0 +1,122 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from lnaddr import client
+
+ADDRESS = "alice@example.com"
+DISCOVERY_URL = "https://example.com/.well-known/lnurlp/alice"
+CALLBACK = "https://example.com/lnurlp/alice/callback"
+DISCOVERY = {"callback": CALLBACK, "minSendable": 1000, "maxSendable": 1_000_000}
+
+
+def send_body(handler, status, body, headers=()):
+    handler.send_response(status)
+    handler.send_header("Content-Type", "application/json")
+    handler.send_header("Content-Length", str(len(body)))
+    for name, value in headers:
+        handler.send_header(name, value)
+    handler.end_headers()
+    handler.wfile.write(body)
+
+
+class LNURLServer:
+    """A keep-alive HTTP server on 127.0.0.1 answering from ``routes``.
+
+    ``routes`` maps a path (query string excluded) to a JSON-serialisable
+    body, raw bytes, or a callable that receives the request handler and
+    writes the response itself. Requested paths, query included, are kept
+    in ``requests`` and client addresses in ``connections``.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self.connections = set()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.requests.append(self.path)
+                server.connections.add(self.client_address)
+                route = server.routes.get(self.path.split("?")[0])
+                if route is None:
+                    send_body(self, 404, b'{"status": "ERROR", "reason": "not found"}')
+                elif callable(route):
+                    route(self)
+                else:
+                    body = route if isinstance(route, bytes) else json.dumps(route).encode()
+                    send_body(self, 200, body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+
+    def add_user(self, username, pr="lnbc10n1abc", **discovery):
+        """Serve a discovery document and an invoice-returning callback."""
+        callback = f"{self.url}/cb/{username}"
+        self.routes[f"/.well-known/lnurlp/{username}"] = dict(
+            {"callback": callback, "minSendable": 1000, "maxSendable": 1_000_000}, **discovery)
+        self.routes[f"/cb/{username}"] = {"pr": pr}
+        return callback
+
+
+@pytest.fixture
+def lnurl_server():
+    server = LNURLServer()
+    thread = threading.Thread(target=server.httpd.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+
+@pytest.fixture
+def local_payurl(lnurl_server, monkeypatch):
+    """Point every lightning address at ``lnurl_server`` over plain HTTP."""
+    def get_payurl(email):
+        return f"{lnurl_server.url}/.well-known/lnurlp/{email.split('@')[0]}"
+    monkeypatch.setattr(client, "get_payurl", get_payurl)
+    return get_payurl
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    client.clear_lnurlp_cache()
+    yield
+    client.clear_lnurlp_cache()
+
+
+class FakeProvider:
+    """Stands in for get_discovery/get_json and records every URL fetched."""
+
+    def __init__(self, discovery=DISCOVERY, callbacks=()):
+        self.discovery = discovery
+        self.callbacks = list(callbacks)
+        self.fetched = []
+
+    def get_discovery(self, url):
+        self.fetched.append(url)
+        return self.discovery
+
+    def get_json(self, url):
+        self.fetched.append(url)
+        answer = self.callbacks.pop(0) if self.callbacks else {"pr": "lnbc10n1abc"}
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    fake = FakeProvider()
+    monkeypatch.setattr(client, "get_discovery", fake.get_discovery)
+    monkeypatch.setattr(client, "get_json", fake.get_json)
+    return fake
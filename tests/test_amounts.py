@@ -0,0 +1,36 @@
+import pytest
+
+from lnaddr import client
+
+from conftest import ADDRESS, DISCOVERY_URL
+
+
+def test_amount_above_cached_max_is_rejected_without_requests(provider):
+    client.get_bolt11(ADDRESS, 5)
+    provider.fetched.clear()
+    with pytest.raises(ValueError, match="maxSendable"):
+        client.get_bolt11(ADDRESS, 1001)
+    assert provider.fetched == []
+
+
+def test_amount_above_discovered_max_skips_callback(provider):
+    with pytest.raises(ValueError, match="maxSendable"):
+        client.get_bolt11(ADDRESS, 1001)
+    assert provider.fetched == [DISCOVERY_URL]
+
+
+@pytest.mark.parametrize("amount", [-1, 1.5, True, client._MAX_AMOUNT_SAT + 1])
+def test_invalid_amount_is_rejected_without_requests(provider, amount):
+    with pytest.raises(ValueError):
+        client.get_bolt11(ADDRESS, amount)
+    assert provider.fetched == []
+
+
+def test_amount_cap_fits_u32_millisats():
+    assert client._MAX_AMOUNT_SAT == 4_294_967
+    client.validate_amount(client._MAX_AMOUNT_SAT)
+    assert client._MAX_AMOUNT_SAT * 1000 <= 2**32 - 1 < (client._MAX_AMOUNT_SAT + 1) * 1000
+
+
+def test_amount_within_max_sendable_is_requested(provider):
+    assert client.get_bolt11(ADDRESS, 1000) == "LNBC10N1ABC"
@@ -0,0 +1,76 @@
+import importlib.util
+
+import pytest
+
+from lnaddr import client
+from lnaddr.client import LNURLError
+
+
+def test_get_bolt11_many_resolves_pairs_in_order(lnurl_server, local_payurl):
+    pytest.importorskip("aiohttp")
+    lnurl_server.add_user("alice", pr="lnbc1alice")
+    lnurl_server.add_user("bob", pr="lnbc1bob")
+
+    results = client.get_bolt11_many([("alice@example.com", 5), ("bob@example.com", 7)])
+
+    assert results == ["LNBC1ALICE", "LNBC1BOB"]
+    assert sorted(lnurl_server.requests) == [
+        "/.well-known/lnurlp/alice",
+        "/.well-known/lnurlp/bob",
+        "/cb/alice?amount=5000",
+        "/cb/bob?amount=7000",
+    ]
+
+
+def test_get_bolt11_many_requires_aiohttp(monkeypatch):
+    monkeypatch.setattr(client, "aiohttp", None)
+    with pytest.raises(RuntimeError, match="aiohttp"):
+        client.get_bolt11_many([("alice@example.com", 5)])
+
+
+def test_get_bolt11_many_http2_resolves_pairs_in_order(lnurl_server, local_payurl):
+    pytest.importorskip("httpx")
+    pytest.importorskip("h2")
+    lnurl_server.add_user("alice", pr="lnbc1alice")
+    lnurl_server.add_user("bob", pr="lnbc1bob")
+
+    results = client.get_bolt11_many_http2([("alice@example.com", 5), ("bob@example.com", 7)])
+
+    assert results == ["LNBC1ALICE", "LNBC1BOB"]
+
+
+@pytest.mark.parametrize("missing", ["httpx", "h2"])
+def test_get_bolt11_many_http2_requires_httpx_and_h2(monkeypatch, missing):
+    if missing == "httpx":
+        monkeypatch.setattr(client, "httpx", None)
+    else:
+        find_spec = importlib.util.find_spec
+        monkeypatch.setattr(importlib.util, "find_spec", lambda name, *a: None if name == "h2" else find_spec(name, *a))
+    with pytest.raises(RuntimeError, match="httpx"):
+        client.get_bolt11_many_http2([("alice@example.com", 5)])
+
+
+def test_batch_reports_expected_errors_per_address(lnurl_server, local_payurl):
+    pytest.importorskip("aiohttp")
+    lnurl_server.add_user("alice")
+    lnurl_server.add_user("carol")
+    lnurl_server.routes["/cb/carol"] = {"status": "ERROR", "reason": "Wallet offline"}
+
+    alice, bad_amount, carol = client.get_bolt11_many(
+        [("alice@example.com", 5), ("bob@example.com", -1), ("carol@example.com", 5)])
+
+    assert alice == "LNBC10N1ABC"
+    assert isinstance(bad_amount, ValueError)
+    assert isinstance(carol, LNURLError)
+
+
+def test_batch_propagates_bugs(lnurl_server, local_payurl, monkeypatch):
+    pytest.importorskip("aiohttp")
+    lnurl_server.add_user("alice")
+
+    def broken(datablock, amount_msat):
+        raise TypeError("bug")
+
+    monkeypatch.setattr(client, "build_payquery", broken)
+    with pytest.raises(TypeError, match="bug"):
+        client.get_bolt11_many([("alice@example.com", 5)])
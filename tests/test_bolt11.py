@@ -0,0 +1,14 @@
+import pytest
+
+from lnaddr import client
+from lnaddr.client import LNURLError
+
+
+def test_extract_bolt11_uppercases_ascii_only():
+    pr = "lnbc2500u1pvjluezpp5qqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqqqsyqcyq5rqwzqfqypq"
+    assert client.extract_bolt11({"pr": pr}) == pr.upper()
+
+
+def test_extract_bolt11_rejects_non_ascii_invoice():
+    with pytest.raises(LNURLError):
+        client.extract_bolt11({"pr": "lnbc1ß"})
@@ -0,0 +1,60 @@
+from lnaddr import client
+from lnaddr.client import _TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(client.time, "monotonic", clock)
+    cache = _TTLCache(maxsize=4, ttl=10)
+    cache.set("a", 1)
+    clock.now += 9
+    assert cache.get("a") == 1
+    clock.now += 2
+    assert cache.get("a") is None
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = _TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_set_refreshes_expiry(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(client.time, "monotonic", clock)
+    cache = _TTLCache(maxsize=4, ttl=10)
+    cache.set("a", 1)
+    clock.now += 8
+    cache.set("a", 2)
+    clock.now += 8
+    assert cache.get("a") == 2
+
+
+def test_ttl_cache_pop_and_clear():
+    cache = _TTLCache(maxsize=4, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.pop("a")
+    cache.pop("missing")
+    assert cache.get("a") is None
+    cache.clear()
+    assert cache.get("b") is None
+
+
+def test_clear_lnurlp_cache():
+    client.remember_discovery("alice@example.com", {"callback": "https://example.com/cb", "minSendable": 1000})
+    client.clear_lnurlp_cache()
+    assert client._DISCOVERY.get("alice@example.com") is None
@@ -0,0 +1,53 @@
+import pytest
+import requests
+
+from lnaddr import cli
+from lnaddr.client import LNURLError
+
+
+@pytest.fixture
+def run(monkeypatch, capsys):
+    def run(answers, bolt11=lambda email, amount: "LNBC1"):
+        calls = []
+
+        def get_bolt11(email, amount):
+            calls.append((email, amount))
+            return bolt11(email, amount)
+
+        answers = iter(answers)
+        monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+        monkeypatch.setattr(cli, "get_bolt11", get_bolt11)
+        monkeypatch.setattr("sys.argv", ["lnaddr"])
+        cli.main()
+        return calls, capsys.readouterr().out
+
+    return run
+
+
+def test_reprompts_until_amount_is_a_non_negative_integer(run):
+    calls, out = run([" alice@example.com ", "ten", "-1", "", "42"])
+    assert calls == [("alice@example.com", 42)]
+    assert out.count("Amount must be a non-negative integer.") == 3
+    assert "Generated bolt11: LNBC1" in out
+
+
+def test_zero_amount_is_accepted(run):
+    calls, _ = run(["alice@example.com", "0"])
+    assert calls == [("alice@example.com", 0)]
+
+
+def raise_(exc):
+    def bolt11(email, amount):
+        raise exc
+    return bolt11
+
+
+@pytest.mark.parametrize("exc, message", [
+    (LNURLError("bad body"), "provider returned an error: bad body"),
+    (ValueError("too much"), "Cannot make a Bolt11: too much"),
+    (requests.ConnectionError("down"), "Could not reach the Lightning Address provider: down"),
+])
+def test_errors_are_reported_not_raised(run, exc, message):
+    _, out = run(["alice@example.com", "5"], bolt11=raise_(exc))
+    assert message in out
+    assert "Generated bolt11" not in out
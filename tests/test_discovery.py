@@ -0,0 +1,87 @@
+import json
+import time
+
+import pytest
+import requests
+
+from lnaddr import client
+from lnaddr.client import LNURLError
+
+
+pytest.importorskip("ijson")
+
+METADATA = json.dumps([["text/plain", "x" * 200_000]])
+
+
+def discovery_body(url, metadata_first=True):
+    fields = f'"callback": "{url}/cb", "minSendable": 1000, "maxSendable": 2000'
+    metadata = f'"metadata": {json.dumps(METADATA)}'
+    parts = (metadata, fields) if metadata_first else (fields, metadata)
+    return ("{" + ", ".join(parts) + ', "tag": "payRequest"}').encode()
+
+
+def partial_body(handler):
+    """Promise a long body but send only its first few bytes."""
+    handler.send_response(200)
+    handler.send_header("Content-Length", "100000")
+    handler.end_headers()
+    handler.wfile.write(b'{"metadata": "xxxx')
+    handler.wfile.flush()
+
+
+@pytest.mark.parametrize("metadata_first", [True, False])
+def test_streams_only_the_fields_needed(lnurl_server, metadata_first):
+    lnurl_server.routes["/d"] = discovery_body(lnurl_server.url, metadata_first)
+    assert client.get_discovery(f"{lnurl_server.url}/d") == {
+        "callback": f"{lnurl_server.url}/cb",
+        "minSendable": 1000,
+        "maxSendable": 2000,
+    }
+
+
+@pytest.mark.parametrize("metadata_first", [True, False])
+def test_short_remainder_is_drained_and_connection_reused(lnurl_server, metadata_first):
+    lnurl_server.routes["/d"] = discovery_body(lnurl_server.url, metadata_first)
+    lnurl_server.routes["/cb"] = {"pr": "lnbc1"}
+    for _ in range(3):
+        client.get_discovery(f"{lnurl_server.url}/d")
+        client.get_json(f"{lnurl_server.url}/cb")
+    assert len(lnurl_server.connections) == 1
+
+
+def test_long_remainder_drops_the_connection(lnurl_server, monkeypatch):
+    monkeypatch.setattr(client, "_DRAIN_LIMIT", 1024)
+    lnurl_server.routes["/d"] = discovery_body(lnurl_server.url, metadata_first=False)
+    lnurl_server.routes["/cb"] = {"pr": "lnbc1"}
+    for _ in range(2):
+        client.get_discovery(f"{lnurl_server.url}/d")
+        client.get_json(f"{lnurl_server.url}/cb")
+    assert len(lnurl_server.connections) > 1
+
+
+def test_invalid_json_raises_lnurl_error(lnurl_server):
+    lnurl_server.routes["/d"] = b"<html>not json</html>"
+    with pytest.raises(LNURLError):
+        client.get_discovery(f"{lnurl_server.url}/d")
+
+
+def test_stall_mid_body_raises_read_timeout(lnurl_server, monkeypatch):
+    monkeypatch.setattr(client, "_TIMEOUT", (1, 0.2))
+
+    def stall(handler):
+        partial_body(handler)
+        time.sleep(1)
+
+    lnurl_server.routes["/d"] = stall
+    with pytest.raises(requests.ReadTimeout):
+        client.get_discovery(f"{lnurl_server.url}/d")
+
+
+def test_reset_mid_body_raises_connection_error(lnurl_server):
+    def reset(handler):
+        partial_body(handler)
+        handler.close_connection = True
+
+    lnurl_server.routes["/d"] = reset
+    with pytest.raises(requests.ConnectionError):
+        client.get_discovery(f"{lnurl_server.url}/d")
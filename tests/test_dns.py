@@ -0,0 +1,85 @@
+import socket
+from collections import OrderedDict
+
+import pytest
+import requests
+import urllib3.util.connection
+
+from lnaddr import client
+
+
+@pytest.fixture
+def dns(monkeypatch):
+    """Fresh DNS cache state, a fake resolver for lnurl.test and no warmer."""
+    monkeypatch.setattr(client, "_DNS", client._TTLCache(maxsize=16, ttl=15))
+    monkeypatch.setattr(client, "_DNS_HITS", OrderedDict())
+    monkeypatch.setattr(client, "_start_dns_warmer", lambda: None)
+    real_getaddrinfo = socket.getaddrinfo
+    fake = {"answers": [], "calls": []}
+
+    def getaddrinfo(host, port, family=0, *args, **kwargs):
+        if host != "lnurl.test":
+            return real_getaddrinfo(host, port, family, *args, **kwargs)
+        fake["calls"].append((host, port, family))
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (ip, port)) for ip in fake["answers"]]
+
+    monkeypatch.setattr(socket, "getaddrinfo", getaddrinfo)
+    return fake
+
+
+def test_import_leaves_urllib3_alone():
+    assert urllib3.util.connection.create_connection.__module__ == "urllib3.util.connection"
+    assert isinstance(client._get_session().get_adapter("https://example.com"), client._CachedDNSAdapter)
+
+
+def test_session_connects_through_cache_trying_each_address(lnurl_server, dns):
+    lnurl_server.routes["/ping"] = {"ok": True}
+    port = lnurl_server.httpd.server_port
+    # Nothing listens on 127.0.0.2, so the second address has to be used.
+    dns["answers"] = ["127.0.0.2", "127.0.0.1"]
+
+    assert client.get_json(f"http://lnurl.test:{port}/ping") == {"ok": True}
+
+    assert dns["calls"] == [("lnurl.test", port, urllib3.util.connection.allowed_gai_family())]
+    assert client._DNS.get(("lnurl.test", port)) is not None
+    assert client._DNS_HITS[("lnurl.test", port)][0] == 1
+
+
+def test_cached_lookup_skips_resolver(dns):
+    dns["answers"] = ["127.0.0.1"]
+    first = client._cached_getaddrinfo("lnurl.test", 443)
+    second = client._cached_getaddrinfo("lnurl.test", 443)
+    assert first == second
+    assert len(dns["calls"]) == 1
+    assert client._DNS_HITS[("lnurl.test", 443)][0] == 2
+
+
+def test_empty_lookup_raises_connection_error(dns, monkeypatch):
+    monkeypatch.setattr(client, "_SESSION", None)
+    monkeypatch.setattr(client, "Retry", lambda **kwargs: 0)
+    with pytest.raises(requests.ConnectionError):
+        client.get_json("http://lnurl.test:9/ping")
+
+
+def test_hit_counts_are_bounded(dns, monkeypatch):
+    monkeypatch.setattr(client, "_DNS_HITS_MAX", 2)
+    for host in ("a.test", "b.test", "c.test"):
+        client._note_host((host, 443))
+    assert list(client._DNS_HITS) == [("b.test", 443), ("c.test", 443)]
+
+
+def test_warm_cycle_decays_and_forgets_idle_hosts(dns, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(client.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(client, "_DNS_WARMER", object())
+    for _ in range(4):
+        client._note_host(("busy.test", 443))
+    client._note_host(("quiet.test", 443))
+
+    assert client._hosts_to_warm() == [("busy.test", 443), ("quiet.test", 443)]
+    assert client._DNS_HITS[("busy.test", 443)][0] == 2
+
+    now[0] += client._DNS_IDLE + 1
+    assert client._hosts_to_warm() is None
+    assert not client._DNS_HITS
+    assert client._DNS_WARMER is None
@@ -0,0 +1,39 @@
+import pytest
+
+from lnaddr import client
+from lnaddr.client import LNURLError
+
+from conftest import ADDRESS, CALLBACK
+
+
+@pytest.mark.parametrize("discovery", [
+    [],
+    {"callback": None, "minSendable": 1000},
+    {"callback": CALLBACK},
+    {"callback": CALLBACK, "minSendable": "lots"},
+])
+def test_malformed_discovery_raises_lnurl_error(provider, discovery):
+    provider.discovery = discovery
+    with pytest.raises(LNURLError):
+        client.get_bolt11(ADDRESS, 5)
+    assert client._DISCOVERY.get(ADDRESS) is None
+
+
+@pytest.mark.parametrize("answer", [[], {"pr": 5}, {"pr": "lnbcé"}, {}])
+def test_malformed_callback_raises_lnurl_error(provider, answer):
+    provider.callbacks = [answer]
+    with pytest.raises(LNURLError):
+        client.get_bolt11(ADDRESS, 5)
+
+
+def test_provider_reason_raises_lnurl_error(provider):
+    provider.callbacks = [{"status": "ERROR", "reason": "Amount too small"}]
+    with pytest.raises(LNURLError, match="Amount too small"):
+        client.get_bolt11(ADDRESS, 5)
+
+
+def test_provider_reason_from_local_server(lnurl_server, local_payurl):
+    lnurl_server.add_user("alice")
+    lnurl_server.routes["/cb/alice"] = {"status": "ERROR", "reason": "Wallet offline"}
+    with pytest.raises(LNURLError, match="Wallet offline"):
+        client.get_bolt11(ADDRESS, 5)
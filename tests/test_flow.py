@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+import requests
+
+from lnaddr import client
+from lnaddr.client import LNURLError
+
+from conftest import ADDRESS, CALLBACK, DISCOVERY, DISCOVERY_URL
+
+
+def test_get_bolt11_keeps_callback_query(provider):
+    provider.discovery = dict(DISCOVERY, callback=CALLBACK + "?id=1")
+    client.get_bolt11(ADDRESS, 5)
+    assert provider.fetched[-1] == CALLBACK + "?id=1&amount=5000"
+
+
+def test_get_bolt11_raises_to_min_sendable(provider):
+    client.get_bolt11(ADDRESS, 0)
+    assert provider.fetched[-1] == CALLBACK + "?amount=1000"
+
+
+def test_get_bolt11_against_local_server(lnurl_server, local_payurl):
+    lnurl_server.add_user("alice")
+    lnurl_server.routes["/.well-known/lnurlp/alice"]["callback"] += "?id=1"
+    assert client.get_bolt11(ADDRESS, 5) == "LNBC10N1ABC"
+    assert lnurl_server.requests == ["/.well-known/lnurlp/alice", "/cb/alice?id=1&amount=5000"]
+
+
+def test_get_bolt11_discovers_then_reuses_callback(provider):
+    assert client.get_bolt11(ADDRESS, 5) == "LNBC10N1ABC"
+    assert client.get_bolt11(ADDRESS, 7) == "LNBC10N1ABC"
+    assert provider.fetched == [
+        DISCOVERY_URL,
+        CALLBACK + "?amount=5000",
+        CALLBACK + "?amount=7000",
+    ]
+
+
+@pytest.mark.parametrize("failure", [
+    requests.ConnectionError("gone"),
+    LNURLError("invalid JSON"),
+    {"status": "ERROR", "reason": "unknown callback"},
+])
+def test_cached_callback_failure_rediscovers(provider, failure):
+    client.get_bolt11(ADDRESS, 5)
+    provider.fetched.clear()
+    provider.callbacks = [failure]
+    assert client.get_bolt11(ADDRESS, 5) == "LNBC10N1ABC"
+    assert provider.fetched == [
+        CALLBACK + "?amount=5000",
+        DISCOVERY_URL,
+        CALLBACK + "?amount=5000",
+    ]
+
+
+def test_async_flow_shares_cache_with_sync(provider):
+    fetched = []
+
+    async def fetch_json(url):
+        fetched.append(url)
+        return provider.discovery if url == DISCOVERY_URL else {"pr": "lnbc1"}
+
+    assert asyncio.run(client._get_bolt11_async(fetch_json, ADDRESS, 5)) == "LNBC1"
+    assert client.get_bolt11(ADDRESS, 5) == "LNBC10N1ABC"
+    assert fetched == [DISCOVERY_URL, CALLBACK + "?amount=5000"]
+    assert provider.fetched == [CALLBACK + "?amount=5000"]
+
+
+def test_stale_cached_callback_rediscovers_against_local_server(lnurl_server, local_payurl):
+    lnurl_server.add_user("alice")
+    client.remember_discovery(ADDRESS, {"callback": f"{lnurl_server.url}/gone", "minSendable": 1000})
+    assert client.get_bolt11(ADDRESS, 5) == "LNBC10N1ABC"
+    assert lnurl_server.requests == ["/gone?amount=5000", "/.well-known/lnurlp/alice", "/cb/alice?amount=5000"]
+    assert client._DISCOVERY.get(ADDRESS)["callback"] == f"{lnurl_server.url}/cb/alice"
@@ -0,0 +1,60 @@
+import logging
+
+import pytest
+
+from lnaddr import client
+
+from conftest import ADDRESS, DISCOVERY_URL
+
+
+def test_get_payurl():
+    assert client.get_payurl(ADDRESS) == DISCOVERY_URL
+
+
+def test_get_payurl_keeps_port_and_lud16_characters():
+    assert client.get_payurl("a.b-c_d+e@pay.example.com:8443") == (
+        "https://pay.example.com:8443/.well-known/lnurlp/a.b-c_d+e")
+
+
+@pytest.mark.parametrize("address", [
+    "alice",
+    "alice@example",
+    "a@b@c.com",
+    "al ice@example.com",
+    "Alice@example.com",
+    "a/../x@host.com",
+    "..@host.com",
+    "a?x=1@host.com",
+    "a#frag@host.com",
+    "a:b@host.com",
+    "bob@evil.com/x.y",
+    "bob@evil.com?x.y",
+    "bob@evil.com#x.y",
+    "bob@host.com:port",
+    None,
+])
+def test_get_payurl_rejects_malformed_addresses(address):
+    with pytest.raises(ValueError):
+        client.get_payurl(address)
+
+
+@pytest.mark.parametrize("address", [["alice@example.com"], {"alice": "example.com"}, 5])
+def test_get_bolt11_rejects_non_string_addresses(provider, address):
+    with pytest.raises(ValueError, match="malformed"):
+        client.get_bolt11(address, 5)
+    assert provider.fetched == []
+
+
+def test_verbose_trace_logs_url_on_every_call(provider, caplog):
+    caplog.set_level(logging.INFO, logger="lnaddr")
+    client.get_bolt11(ADDRESS, 5)
+    client.get_bolt11(ADDRESS, 5)
+    traced = [r.getMessage() for r in caplog.records if r.getMessage().startswith("Transformed URL")]
+    assert traced == [f"Transformed URL: {DISCOVERY_URL}"] * 2
+
+
+def test_get_payurl_is_memoized():
+    client.get_payurl.cache_clear()
+    client.get_payurl(ADDRESS)
+    client.get_payurl(ADDRESS)
+    assert client.get_payurl.cache_info().hits == 1
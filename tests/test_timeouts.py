@@ -0,0 +1,48 @@
+import time
+
+import pytest
+import requests
+
+from lnaddr import client
+
+from conftest import ADDRESS, send_body
+
+
+@pytest.fixture
+def short_timeout(monkeypatch):
+    monkeypatch.setattr(client, "_TIMEOUT", (1, 0.2))
+
+
+def stall(handler):
+    time.sleep(1)
+    send_body(handler, 200, b'{"pr": "lnbc1late"}')
+
+
+def test_read_timeout_surfaces_as_read_timeout(lnurl_server, short_timeout):
+    lnurl_server.routes["/slow"] = stall
+    with pytest.raises(requests.ReadTimeout):
+        client.get_json(f"{lnurl_server.url}/slow")
+    assert lnurl_server.requests == ["/slow"]
+
+
+def test_stalled_cached_callback_is_not_rediscovered(lnurl_server, local_payurl, short_timeout):
+    lnurl_server.add_user("alice")
+    lnurl_server.routes["/slow"] = stall
+    client.remember_discovery(ADDRESS, {"callback": f"{lnurl_server.url}/slow", "minSendable": 1000})
+
+    with pytest.raises(requests.Timeout):
+        client.get_bolt11(ADDRESS, 5)
+
+    assert lnurl_server.requests == ["/slow?amount=5000"]
+
+
+def test_server_errors_are_retried(lnurl_server):
+    answers = [503, 200]
+
+    def flaky(handler):
+        status = answers.pop(0)
+        send_body(handler, status, b'{"ok": true}' if status == 200 else b"{}")
+
+    lnurl_server.routes["/flaky"] = flaky
+    assert client.get_json(f"{lnurl_server.url}/flaky") == {"ok": True}
+    assert lnurl_server.requests == ["/flaky", "/flaky"]